@@ -1,177 +1,345 @@
+import atexit
+import copy
 import os
 import json
+import logging
 import sys
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
 
-def analyze_error(error_id):
-    # Simulate error analysis
-    error_details = {
-        "error_id": error_id,
-        "type": "DatabaseError" if error_id == "ERR_123" else "AuthenticationError",
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "message": "Database connection timeout" if error_id == "ERR_123" else "Invalid authentication token",
-        "request_id": "req_123" if error_id == "ERR_123" else "req_789",
-        "user_id": "user_456" if error_id == "ERR_123" else "user_123",
-        "endpoint": "/api/v1/users" if error_id == "ERR_123" else "/api/v1/auth",
-        "stack_trace": [
-            "app/database.py:45: connect()",
-            "app/models.py:23: get_user()",
-            "app/views.py:12: user_view()"
-        ] if error_id == "ERR_123" else [
-            "app/auth.py:67: validate_token()",
-            "app/middleware.py:34: auth_middleware()",
-            "app/views.py:45: protected_view()"
-        ]
-    }
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-    code_analysis = [
-        {
-            "file_path": "app/database.py",
-            "error_lines": [45],
-            "context_lines": {
-                "43": "def connect():",
-                "44": "    try:",
-                "45": "        db = Database(timeout=5)  # Error line",
-                "46": "        return db.connect()",
-                "47": "    except Exception as e:"
-            },
-            "blame_info": {
-                "45": {
-                    "author": "John Doe",
-                    "commit": "abc123",
-                    "date": "2024-02-19"
-                }
-            }
+logger = logging.getLogger(__name__)
+
+# Issue files are written and notifications sent in the background so
+# analyze_error returns as soon as the analysis is ready. Worker threads are
+# joined at interpreter exit, so the CLI still finishes both before exiting.
+_io_pool = ThreadPoolExecutor(max_workers=4)
+
+# Keep-alive session for notifications, created on the first notification
+_session = None
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Mock analysis results for each known error scenario, built once at import.
+# Error IDs without their own scenario get the authentication one.
+_ERROR_FIXTURES = {
+    "ERR_123": {
+        "error_details": {
+            "type": "DatabaseError",
+            "message": "Database connection timeout",
+            "request_id": "req_123",
+            "user_id": "user_456",
+            "endpoint": "/api/v1/users",
+            "stack_trace": [
+                "app/database.py:45: connect()",
+                "app/models.py:23: get_user()",
+                "app/views.py:12: user_view()"
+            ]
         },
-        {
-            "file_path": "app/models.py",
-            "error_lines": [23],
-            "context_lines": {
-                "21": "def get_user(user_id):",
-                "22": "    try:",
-                "23": "        return db.query(f'SELECT * FROM users WHERE id = {user_id}')",
-                "24": "    except Exception as e:",
-                "25": "        raise DatabaseError(str(e))"
-            },
-            "blame_info": {
-                "23": {
-                    "author": "Jane Smith",
-                    "commit": "def456",
-                    "date": "2024-02-18"
+        "code_analysis": [
+            {
+                "file_path": "app/database.py",
+                "error_lines": [45],
+                "context_lines": {
+                    "43": "def connect():",
+                    "44": "    try:",
+                    "45": "        db = Database(timeout=5)  # Error line",
+                    "46": "        return db.connect()",
+                    "47": "    except Exception as e:"
+                },
+                "blame_info": {
+                    "45": {
+                        "author": "John Doe",
+                        "commit": "abc123",
+                        "date": "2024-02-19"
+                    }
                 }
-            }
-        }
-    ] if error_id == "ERR_123" else [
-        {
-            "file_path": "app/auth.py",
-            "error_lines": [67],
-            "context_lines": {
-                "65": "def validate_token(token):",
-                "66": "    try:",
-                "67": "        if not token or len(token) < 32:  # Error line",
-                "68": "            raise AuthenticationError('Invalid token')",
-                "69": "        return decode_token(token)"
             },
-            "blame_info": {
-                "67": {
-                    "author": "Bob Wilson",
-                    "commit": "ghi789",
-                    "date": "2024-02-17"
+            {
+                "file_path": "app/models.py",
+                "error_lines": [23],
+                "context_lines": {
+                    "21": "def get_user(user_id):",
+                    "22": "    try:",
+                    "23": "        return db.query(f'SELECT * FROM users WHERE id = {user_id}')",
+                    "24": "    except Exception as e:",
+                    "25": "        raise DatabaseError(str(e))"
+                },
+                "blame_info": {
+                    "23": {
+                        "author": "Jane Smith",
+                        "commit": "def456",
+                        "date": "2024-02-18"
+                    }
                 }
             }
+        ],
+        "llm_analysis": {
+            "root_cause": "Insufficient timeout value for database connection",
+            "code_level_explanation": "The database connection is timing out because the timeout value of 5 seconds is too low for the current load. The error occurs in database.py when trying to establish a connection.",
+            "suggested_fixes": [
+                "Increase database connection timeout to 30 seconds",
+                "Implement connection pooling",
+                "Add retry mechanism with exponential backoff"
+            ],
+            "prevention_measures": [
+                "Implement circuit breakers for database operations",
+                "Add monitoring for database connection metrics",
+                "Set up alerts for connection timeouts"
+            ]
+        }
+    },
+    "ERR_456": {
+        "error_details": {
+            "type": "AuthenticationError",
+            "message": "Invalid authentication token",
+            "request_id": "req_789",
+            "user_id": "user_123",
+            "endpoint": "/api/v1/auth",
+            "stack_trace": [
+                "app/auth.py:67: validate_token()",
+                "app/middleware.py:34: auth_middleware()",
+                "app/views.py:45: protected_view()"
+            ]
         },
-        {
-            "file_path": "app/middleware.py",
-            "error_lines": [34],
-            "context_lines": {
-                "32": "def auth_middleware(request):",
-                "33": "    try:",
-                "34": "        token = request.headers.get('Authorization')",
-                "35": "        if not token:",
-                "36": "            raise AuthenticationError('No token provided')"
+        "code_analysis": [
+            {
+                "file_path": "app/auth.py",
+                "error_lines": [67],
+                "context_lines": {
+                    "65": "def validate_token(token):",
+                    "66": "    try:",
+                    "67": "        if not token or len(token) < 32:  # Error line",
+                    "68": "            raise AuthenticationError('Invalid token')",
+                    "69": "        return decode_token(token)"
+                },
+                "blame_info": {
+                    "67": {
+                        "author": "Bob Wilson",
+                        "commit": "ghi789",
+                        "date": "2024-02-17"
+                    }
+                }
             },
-            "blame_info": {
-                "34": {
-                    "author": "Alice Brown",
-                    "commit": "jkl012",
-                    "date": "2024-02-16"
+            {
+                "file_path": "app/middleware.py",
+                "error_lines": [34],
+                "context_lines": {
+                    "32": "def auth_middleware(request):",
+                    "33": "    try:",
+                    "34": "        token = request.headers.get('Authorization')",
+                    "35": "        if not token:",
+                    "36": "            raise AuthenticationError('No token provided')"
+                },
+                "blame_info": {
+                    "34": {
+                        "author": "Alice Brown",
+                        "commit": "jkl012",
+                        "date": "2024-02-16"
+                    }
                 }
             }
-        }
-    ]
-
-    llm_analysis = {
-        "root_cause": "Insufficient timeout value for database connection" if error_id == "ERR_123" else "Insufficient token validation",
-        "code_level_explanation": "The database connection is timing out because the timeout value of 5 seconds is too low for the current load. The error occurs in database.py when trying to establish a connection." if error_id == "ERR_123" else "The authentication token validation is failing because the token length check is too strict. The error occurs in auth.py when validating the token.",
-        "suggested_fixes": [
-            "Increase database connection timeout to 30 seconds",
-            "Implement connection pooling",
-            "Add retry mechanism with exponential backoff"
-        ] if error_id == "ERR_123" else [
-            "Update token validation logic to handle different token formats",
-            "Add better error messages for token validation failures",
-            "Implement token refresh mechanism"
         ],
-        "prevention_measures": [
-            "Implement circuit breakers for database operations",
-            "Add monitoring for database connection metrics",
-            "Set up alerts for connection timeouts"
-        ] if error_id == "ERR_123" else [
-            "Add comprehensive token validation tests",
-            "Implement token blacklisting for revoked tokens",
-            "Set up monitoring for authentication failures"
-        ]
+        "llm_analysis": {
+            "root_cause": "Insufficient token validation",
+            "code_level_explanation": "The authentication token validation is failing because the token length check is too strict. The error occurs in auth.py when validating the token.",
+            "suggested_fixes": [
+                "Update token validation logic to handle different token formats",
+                "Add better error messages for token validation failures",
+                "Implement token refresh mechanism"
+            ],
+            "prevention_measures": [
+                "Add comprehensive token validation tests",
+                "Implement token blacklisting for revoked tokens",
+                "Set up monitoring for authentication failures"
+            ]
+        }
     }
+}
 
-    git_commits = [
-        {
-            "hash": "abc123",
-            "author": "John Doe",
-            "date": "2024-02-19",
-            "message": "Update app/database.py",
-            "files_changed": ["app/database.py"]
-        },
-        {
-            "hash": "def456",
-            "author": "Jane Smith",
-            "date": "2024-02-18",
-            "message": "Update app/models.py",
-            "files_changed": ["app/models.py"]
-        }
-    ] if error_id == "ERR_123" else [
-        {
-            "hash": "ghi789",
-            "author": "Bob Wilson",
-            "date": "2024-02-17",
-            "message": "Update app/auth.py",
-            "files_changed": ["app/auth.py"]
-        },
-        {
-            "hash": "jkl012",
-            "author": "Alice Brown",
-            "date": "2024-02-16",
-            "message": "Update app/middleware.py",
-            "files_changed": ["app/middleware.py"]
-        }
-    ]
+def _commits_from_blame(code_analysis):
+    """List the commits blamed for the analysed lines, one entry per commit."""
+    commits = {}
+    for analysis in code_analysis:
+        file_path = analysis["file_path"]
+        for blame in analysis["blame_info"].values():
+            commit = commits.get(blame["commit"])
+            if commit is None:
+                commits[blame["commit"]] = {
+                    "hash": blame["commit"],
+                    "author": blame["author"],
+                    "date": blame["date"],
+                    "message": f"Update {file_path}",
+                    "files_changed": [file_path]
+                }
+            elif file_path not in commit["files_changed"]:
+                commit["files_changed"].append(file_path)
+    return list(commits.values())
+
+def _add_git_commits(fixtures):
+    """Derive each scenario's commits from its blame info, once at import."""
+    for fixture in fixtures.values():
+        fixture["git_commits"] = _commits_from_blame(fixture["code_analysis"])
+
+_add_git_commits(_ERROR_FIXTURES)
+# Shared by ERR_456 and unknown IDs; never handed out, analyze_error returns copies
+_DEFAULT_FIXTURE = _ERROR_FIXTURES["ERR_456"]
+
+# Issue data recently produced by this process, keyed by error ID, together
+# with its rendered JSON and a future for the mtime of the issue file. The
+# least recently used entry is evicted beyond _ANALYSIS_CACHE_SIZE.
+_ANALYSIS_CACHE_SIZE = 256
+_analysis_cache: "OrderedDict[str, Tuple[Dict[str, Any], bytes, Future[int]]]" = OrderedDict()
+
+def _now_iso():
+    """Current UTC time in ISO 8601 format with a trailing Z."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def _dumps_indented(data):
+    """Serialize to 2-space indented JSON bytes, with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+def _dumps_compact(data):
+    """Serialize to JSON bytes without insignificant whitespace."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+def _write_issue_file(filename, rendered):
+    """Write the rendered issue JSON and return the file's mtime.
+
+    Runs on the I/O pool; a failure is logged here and also kept on the
+    returned future for wait_for_issue_file to raise.
+    """
+    try:
+        with open(filename, "wb") as f:
+            f.write(rendered)
+    except OSError as e:
+        logger.error("Could not write issue file %s: %s", filename, e)
+        raise
+    logger.debug("Issue file created: %s", filename)
+    return os.stat(filename).st_mtime_ns
+
+def _notify_session():
+    """Return the notification session, importing requests on first use."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        _session = requests.Session()
+        _session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        # Pool threads are joined before atexit handlers run, so pending
+        # notifications are sent before the session is closed
+        atexit.register(_session.close)
+    return _session
+
+def _post_notify(session, url, issue_data):
+    """Send the analysis to the notification API; failures are only logged."""
+    import requests
+    try:
+        resp = session.post(
+            url,
+            data=_dumps_compact(issue_data),
+            headers=_JSON_HEADERS,
+            timeout=5
+        )
+    except requests.RequestException as e:
+        logger.warning("Could not send notification for %s: %s", issue_data["error_id"], e)
+        return
+    logger.info("Notification sent for %s: %s", issue_data["error_id"], resp.status_code)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Notification response body: %s", resp.text)
+
+def wait_for_issue_file(error_id):
+    """Block until the issue file for a recently analysed error is on disk.
+
+    Raises the error if writing the file failed.
+    """
+    _analysis_cache[error_id][2].result()
+
+def rendered_issue(error_id):
+    """Return the issue JSON already rendered for a recently analysed error."""
+    return _analysis_cache[error_id][1]
+
+def analyze_error(error_id, quiet=False):
+    filename = f"issue_{error_id}.json"
+    cached = _analysis_cache.get(error_id)
+    if cached is not None:
+        # Repeat analysis: reuse the result, rewriting the file only if it
+        # was removed or modified since
+        _analysis_cache.move_to_end(error_id)
+        issue_data, rendered, written = cached
+        try:
+            fresh = os.stat(filename).st_mtime_ns == written.result()
+        except OSError:
+            # Removed since, or the earlier write failed: write it again
+            fresh = False
+        if not fresh:
+            written = _io_pool.submit(_write_issue_file, filename, rendered)
+            _analysis_cache[error_id] = (issue_data, rendered, written)
+        if not quiet:
+            print(f"Generated Issue File:\n{rendered.decode()}")
+        return copy.deepcopy(issue_data)
+
+    # Simulate error analysis
+    fixture = _ERROR_FIXTURES.get(error_id, _DEFAULT_FIXTURE)
+    details = fixture["error_details"]
+    timestamp = _now_iso()
+    error_details = {
+        "error_id": error_id,
+        "type": details["type"],
+        "timestamp": timestamp,
+        **details
+    }
 
     issue_data = {
         "error_id": error_id,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": timestamp,
         "error_details": error_details,
-        "code_analysis": code_analysis,
-        "llm_analysis": llm_analysis,
-        "git_commits": git_commits
+        "code_analysis": fixture["code_analysis"],
+        "llm_analysis": fixture["llm_analysis"],
+        "git_commits": fixture["git_commits"]
     }
 
-    # Save to file
-    filename = f"issue_{error_id}.json"
-    with open(filename, "w") as f:
-        json.dump(issue_data, f, indent=2)
-    print(f"Generated Issue File:\n{json.dumps(issue_data, indent=2)}")
+    # Save to file and notify; the JSON is rendered once for both the file
+    # and the printout
+    rendered = _dumps_indented(issue_data)
+    written = _io_pool.submit(_write_issue_file, filename, rendered)
+    _analysis_cache[error_id] = (issue_data, rendered, written)
+    if len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+    # Notifying is opt-in: only when NOTIFY_URL points at a notification API
+    notify_url = os.getenv("NOTIFY_URL")
+    if notify_url:
+        _io_pool.submit(_post_notify, _notify_session(), notify_url, issue_data)
+    if not quiet:
+        print(f"Generated Issue File:\n{rendered.decode()}")
+    # issue_data shares the scenario's fixture data, so callers get a copy
+    return copy.deepcopy(issue_data)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python debug_analyzer_v2.py <error_id>")
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if len(sys.argv) < 2:
+        print("Usage: python debug_analyzer_v2.py <error_id> [<error_id> ...]")
+        print("       python debug_analyzer_v2.py -   (read error IDs from stdin, one per line)")
         sys.exit(1)
-    analyze_error(sys.argv[1]) 
\ No newline at end of file
+    # Several errors are analysed in one interpreter to share startup cost
+    error_ids = sys.argv[1:]
+    if error_ids == ["-"]:
+        error_ids = [line.strip() for line in sys.stdin if line.strip()]
+    for error_id in error_ids:
+        analyze_error(error_id)
+        # Surface a failed issue-file write, and a non-zero exit status
+        wait_for_issue_file(error_id)
@@ -2,76 +2,105 @@ import subprocess
 import time
 import json
 import os
-from pathlib import Path
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-import uvicorn
+import sys
+from types import ModuleType
+from typing import Any, List, Optional, Sequence, cast
 import logging
 import threading
 
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from debug_analyzer_v2 import analyze_error, rendered_issue, wait_for_issue_file
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Create FastAPI app
-app = FastAPI()
+# Pacing pauses between demo steps are scaled by DEMO_PACING; the default of 0
+# runs the demo straight through, 1 gives presentation speed
+PACING = float(os.getenv("DEMO_PACING", "0"))
 
-@app.post("/notify")
-async def notify_error(error_data: dict):
-    # Remove root_cause and suggested_fixes from the notification payload
-    notification_data = {
-        "error_id": error_data["error_id"],
-        "timestamp": error_data["timestamp"],
-        "type": error_data["error_details"]["type"],
-        "message": error_data["error_details"]["message"],
-        "request_id": error_data["error_details"]["request_id"],
-        "user_id": error_data["error_details"]["user_id"],
-        "endpoint": error_data["error_details"]["endpoint"],
-        "stack_trace": error_data["error_details"]["stack_trace"]
-    }
-    print(f"Received notification: {json.dumps(notification_data, indent=2)}")
-    return {"status": "Notification received"}
+def pause(seconds: float) -> None:
+    """Sleep for a pacing delay, scaled by DEMO_PACING."""
+    if PACING:
+        time.sleep(PACING * seconds)
 
-def run_api():
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+SECTION_RULE = "=" * 80
+SUMMARY_RULE = "-" * 80
 
-def print_section(title):
-    print("\n" + "="*80)
-    print(f" {title} ".center(80, "="))
-    print("="*80 + "\n")
-    time.sleep(2)  # Reduced delay after section headers
+def print_section(title: str) -> None:
+    print(f"\n{SECTION_RULE}\n{f' {title} ':=^80}\n{SECTION_RULE}\n")
+    pause(2)  # Reduced delay after section headers
 
-def print_summary(title, points):
+def print_summary(title: str, points: List[str]) -> None:
     """Print a summary section with bullet points."""
-    print("\n" + "-"*80)
-    print(f" {title} ".center(80, "-"))
-    print("-"*80)
-    for point in points:
-        print(f"• {point}")
-    print("-"*80 + "\n")
-    time.sleep(3)  # Reduced delay after summary
+    bullets = "".join(f"• {point}\n" for point in points)
+    print(f"\n{SUMMARY_RULE}\n{f' {title} ':-^80}\n{SUMMARY_RULE}\n{bullets}{SUMMARY_RULE}\n")
+    pause(3)  # Reduced delay after summary
+
+def print_json(data: Any) -> None:
+    if orjson is not None:
+        print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+    else:
+        print(json.dumps(data, indent=2))
+    pause(3)  # Reduced delay after printing JSON data
+
+def _feed_pipe(fd: int, data: bytes) -> None:
+    """Write data to a pipe and close it; a reader that exits early is fine."""
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BrokenPipeError:
+        pass  # the command stopped reading its input
+    finally:
+        os.close(fd)
 
-def print_json(data):
-    print(json.dumps(data, indent=2))
-    time.sleep(3)  # Reduced delay after printing JSON data
+def start_command(cmd: Sequence[str], capture: bool = False,
+                  input: Optional[bytes] = None) -> subprocess.Popen:
+    """Start a command in the background; collect it with finish_command.
 
-def run_command(cmd, check=True):
-    """Run a command and handle errors gracefully."""
+    Output is only kept (and returned) when capture is set; otherwise stdout
+    is discarded and just stderr is collected for error reports. Bytes given
+    as input are fed to the command's stdin while it runs.
+    """
+    stdin = None
+    if input is not None:
+        stdin, feed = os.pipe()
+        threading.Thread(target=_feed_pipe, args=(feed, input), daemon=True).start()
+    stdout = subprocess.PIPE if capture else subprocess.DEVNULL
+    # close_fds=False lets CPython launch through posix_spawn instead of
+    # fork+exec; our own descriptors are non-inheritable anyway (PEP 446)
     try:
-        result = subprocess.run(cmd, check=check, capture_output=True, text=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command {' '.join(cmd)}:")
-        print(f"Exit code: {e.returncode}")
-        print(f"Output: {e.output}")
-        if check:
-            raise
-        return None
+        return subprocess.Popen(cmd, stdin=stdin, stdout=stdout, stderr=subprocess.PIPE,
+                                text=True, close_fds=False)
+    finally:
+        if stdin is not None:
+            os.close(stdin)
 
-def run_demo():
+def finish_command(proc: subprocess.Popen, check: bool = True) -> Optional[str]:
+    """Wait for a started command and handle errors gracefully."""
+    stdout, stderr = proc.communicate()
+    if check and proc.returncode:
+        # start_command only takes a sequence of strings
+        args = cast(Sequence[str], proc.args)
+        print(f"Error running command {' '.join(args)}:")
+        print(f"Exit code: {proc.returncode}")
+        print(f"Output: {stderr if stdout is None else stdout}")
+        raise subprocess.CalledProcessError(proc.returncode, proc.args, stdout, stderr)
+    return stdout
+
+def run_command(cmd: Sequence[str], check: bool = True, capture: bool = False) -> Optional[str]:
+    """Run a command to completion and handle errors gracefully."""
+    return finish_command(start_command(cmd, capture), check)
+
+def run_demo() -> None:
     print_section("NoMoreOnCall Demo")
     print("This demo will show how NoMoreOnCall analyzes and fixes errors.\n")
-    time.sleep(2)  # Reduced delay after intro
+    pause(2)  # Reduced delay after intro
     
     print_summary("Demo Overview", [
         "We'll demonstrate how NoMoreOnCall handles a database timeout error",
@@ -83,9 +112,13 @@ def run_demo():
     # Start the notification API in a separate thread
     print_section("Starting Notification API")
     print("Starting the notification API on port 8001...")
-    api_thread = threading.Thread(target=run_api, daemon=True)
+    # FastAPI, pydantic and uvicorn are only imported once the API is started
+    from notification_api import create_server, wait_for_api
+    api_server = create_server(port=8001)
+    # Have the analyzer notify the API started here
+    os.environ.setdefault("NOTIFY_URL", "http://localhost:8001/notify")
+    api_thread = threading.Thread(target=api_server.run, daemon=True)
     api_thread.start()
-    time.sleep(3)  # Reduced wait time for API to start
     
     print_summary("API Setup Complete", [
         "Notification API is now running on port 8001",
@@ -97,9 +130,18 @@ def run_demo():
         # Demo Error 1: Database Timeout
         print_section("Demo Error 1: Database Timeout")
         print("Analyzing database timeout error (ERR_123)...")
-        time.sleep(2)  # Reduced delay before analysis
-        run_command(["python", "debug_analyzer_v2.py", "ERR_123"])
-        time.sleep(3)  # Reduced delay after analysis
+        pause(2)  # Reduced delay before analysis
+        # The API warms up during the sections above; it is first needed for
+        # the notification sent by the analysis
+        if not wait_for_api(api_server):
+            print("Notification API did not start listening on port 8001")
+        # Analyze in-process so the sections below come straight from the result
+        issue_data = analyze_error("ERR_123", quiet=True)
+        # Start the fixer right away, piping it the issue instead of waiting
+        # for the file, so it runs while the analysis sections below are shown
+        fixer = start_command([sys.executable, "code_fixer.py", "-"],
+                              input=rendered_issue("ERR_123"))
+        pause(3)  # Reduced delay after analysis
         
         print_summary("Error Analysis Complete", [
             "Successfully analyzed the database timeout error",
@@ -107,14 +149,9 @@ def run_demo():
             "Generated a detailed issue report"
         ])
         
-        # Show the generated issue file
-        with open("issue_ERR_123.json", "r") as f:
-            issue_data = json.load(f)
-        
         # Break down the issue file into distinct sections
         print_section("Error Details")
         print_json(issue_data["error_details"])
-        time.sleep(2)  # Reduced delay between sections
         
         print_summary("Error Details Analysis", [
             "Identified the error type and message",
@@ -124,7 +161,6 @@ def run_demo():
         
         print_section("Code Analysis")
         print_json(issue_data["code_analysis"])
-        time.sleep(2)  # Reduced delay between sections
         
         print_summary("Code Analysis Results", [
             "Analyzed the affected code files and functions",
@@ -134,7 +170,6 @@ def run_demo():
         
         print_section("LLM Analysis")
         print_json(issue_data["llm_analysis"])
-        time.sleep(3)  # Reduced delay before fixes
         
         print_summary("LLM Analysis Complete", [
             "AI model analyzed the error patterns",
@@ -145,9 +180,9 @@ def run_demo():
         # Generate code fixes
         print_section("Generating Code Fixes")
         print("Generating code fixes for the database timeout error...")
-        time.sleep(2)  # Reduced delay before generating fixes
-        run_command(["python", "code_fixer.py", "issue_ERR_123.json"], check=False)
-        time.sleep(3)  # Reduced delay after generating fixes
+        pause(2)  # Reduced delay before generating fixes
+        finish_command(fixer, check=False)
+        pause(3)  # Reduced delay after generating fixes
         
         print_summary("Code Fixes Generated", [
             "Successfully generated fix recommendations",
@@ -158,9 +193,11 @@ def run_demo():
         print_section("Demo Complete")
         print("The demo has completed successfully!")
         print("\nGenerated files:")
-        for file in Path(".").glob("issue_*.json"):
-            print(f"- {file.name}")
-            time.sleep(1)  # Reduced delay between file listings
+        wait_for_issue_file("ERR_123")
+        with os.scandir(".") as entries:
+            names = [entry.name for entry in entries
+                     if entry.name.startswith("issue_") and entry.name.endswith(".json")]
+        print("\n".join(f"- {name}" for name in names))
         
         print_summary("Demo Summary", [
             "Successfully demonstrated NoMoreOnCall's error handling workflow",
@@ -0,0 +1,98 @@
+import json
+import logging
+import socket
+import threading
+from types import ModuleType
+from typing import List, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, ValidationError
+import uvicorn
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Create FastAPI app
+app = FastAPI(default_response_class=ORJSONResponse if orjson is not None else JSONResponse)
+
+class ErrorDetails(BaseModel, frozen=True):
+    type: str
+    message: str
+    request_id: str
+    user_id: str
+    endpoint: str
+    stack_trace: List[str]
+
+class ErrorNotification(BaseModel, frozen=True):
+    """The part of an issue the notification API uses; other fields are ignored."""
+    error_id: str
+    timestamp: str
+    error_details: ErrorDetails
+
+# The acknowledgement never changes, so one pre-rendered response is shared
+_RECEIVED = Response(content=b'{"status":"Notification received"}', media_type="application/json")
+
+@app.post("/notify")
+async def notify_error(request: Request) -> Response:
+    # Validate straight from the raw body with pydantic's JSON parser
+    try:
+        error_data = ErrorNotification.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    logger.info("Received notification for %s", error_data.error_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        # Remove root_cause and suggested_fixes from the notification payload
+        notification_data = {
+            "error_id": error_data.error_id,
+            "timestamp": error_data.timestamp,
+            **error_data.error_details.model_dump()
+        }
+        logger.debug("Notification payload: %s", json.dumps(notification_data, indent=2))
+    return _RECEIVED
+
+class APIServer(uvicorn.Server):
+    """uvicorn server that signals ``ready`` once startup has finished.
+
+    ``ready`` is also set if the server stops without starting (e.g. the port
+    is taken), so waiters never block for the full timeout.
+    """
+
+    def __init__(self, config: uvicorn.Config) -> None:
+        super().__init__(config)
+        self.ready = threading.Event()
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        await super().startup(sockets)
+        self.ready.set()
+
+    def run(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        try:
+            super().run(sockets)
+        finally:
+            self.ready.set()
+
+def create_server(host: str = "0.0.0.0", port: int = 8001) -> APIServer:
+    """Build the notification API server; call ``run()`` to serve."""
+    # Receipts are logged by notify_error itself, so uvicorn's access log
+    # would only duplicate them. Idle connections are kept for 30s so the
+    # analyzer's pooled session can reuse them between notifications.
+    return APIServer(uvicorn.Config(app, host=host, port=port, access_log=False,
+                                    timeout_keep_alive=30))
+
+def wait_for_api(server: APIServer, timeout: float = 10.0) -> bool:
+    """Wait until the server is accepting connections; False if it never does."""
+    return server.ready.wait(timeout) and server.started
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    create_server().run()
@@ -0,0 +1,158 @@
+import json
+
+import pytest
+
+import code_fixer
+from code_fixer import CodeChange, CodeFixer
+
+ISSUE = {
+    "error_id": "ERR_TEST",
+    "timestamp": "2025-05-10T15:50:42.770309",
+    "error_details": {"type": "DatabaseError", "message": "Database connection timeout"},
+    "code_analysis": [
+        {
+            "file_path": "app/database.py",
+            "error_lines": [2],
+            "context_lines": {"1": "import db", "2": "db = Database(timeout=5)"},
+            "blame_info": {"2": {"author": "alice", "commit": "abc123"}},
+        },
+        {
+            "file_path": "app/models.py",
+            "error_lines": [1, 3],
+            "context_lines": {"1": "conn = db.connect()", "3": "x = 1"},
+            "blame_info": {"1": {"author": "bob", "commit": "def456"}},
+        },
+    ],
+    "llm_analysis": {"suggested_fixes": ["Increase the database timeout"]},
+    "git_commits": [],
+}
+
+
+@pytest.fixture
+def issue_file(tmp_path):
+    path = tmp_path / "issue.json"
+    path.write_text(json.dumps(ISSUE))
+    return str(path)
+
+
+@pytest.fixture
+def fixer(issue_file):
+    return CodeFixer(issue_file)
+
+
+def change(line_number, new_code, file_path="app/file.py"):
+    return CodeChange(
+        file_path=file_path,
+        original_code="",
+        new_code=new_code,
+        line_number=line_number,
+        description="test",
+        author="Unknown",
+        commit_hash="Unknown",
+    )
+
+
+def apply_edits(fixer, path, data, *changes):
+    path.write_bytes(data)
+    fixer._apply_file_edits(str(path), {c.line_number: c for c in changes})
+    return path.read_bytes()
+
+
+def test_apply_file_edits_replaces_lines(fixer, tmp_path):
+    result = apply_edits(fixer, tmp_path / "f.py", b"a\nb\nc\nd\n", change(2, "B"), change(4, "D"))
+    assert result == b"a\nB\nc\nD\n"
+
+
+def test_apply_file_edits_last_line_without_newline(fixer, tmp_path):
+    result = apply_edits(fixer, tmp_path / "f.py", b"a\nb\nc", change(3, "C"))
+    assert result == b"a\nb\nC\n"
+
+
+def test_apply_file_edits_ignores_out_of_range_lines(fixer, tmp_path):
+    data = b"a\nb\nc\n"
+    assert apply_edits(fixer, tmp_path / "f.py", data, change(4, "x"), change(10, "y")) == data
+    assert apply_edits(fixer, tmp_path / "f.py", data, change(0, "x"), change(-1, "y")) == data
+    result = apply_edits(fixer, tmp_path / "f.py", data, change(2, "B"), change(10, "y"))
+    assert result == b"a\nB\nc\n"
+
+
+def test_apply_file_edits_only_touches_the_given_duplicate_line(fixer, tmp_path):
+    result = apply_edits(fixer, tmp_path / "f.py", b"x\nx\nx\n", change(2, "y"))
+    assert result == b"x\ny\nx\n"
+
+
+def test_apply_file_edits_keeps_other_line_endings(fixer, tmp_path):
+    result = apply_edits(fixer, tmp_path / "f.py", b"a\r\nb\r\nc\r\n", change(2, "B"))
+    assert result == b"a\r\nB\nc\r\n"
+
+
+def test_suggest_code_changes(fixer):
+    changes = [(c.file_path, c.line_number, c.new_code, c.author) for c in fixer.suggest_code_changes()]
+    # Lines the fixer leaves unchanged are not suggested
+    assert changes == [
+        ("app/database.py", 2, "db = Database(timeout=30)", "alice"),
+        ("app/models.py", 1, "conn = db.connect(pool_size=5, max_overflow=10)", "bob"),
+    ]
+
+
+def test_streaming_loader_matches_plain_loader(issue_file, monkeypatch):
+    pytest.importorskip("ijson")
+    plain = CodeFixer(issue_file)
+    assert not plain._stream_code_analysis
+
+    monkeypatch.setattr(code_fixer, "_MMAP_THRESHOLD", 0)
+    streamed = CodeFixer(issue_file)
+    assert streamed._stream_code_analysis
+    assert "code_analysis" not in streamed.issue_data
+
+    expected = {key: value for key, value in plain.issue_data.items() if key != "code_analysis"}
+    assert streamed.issue_data == expected
+    assert list(streamed._iter_code_analysis()) == plain.issue_data["code_analysis"]
+
+    def summary(fixer):
+        return [(c.file_path, c.line_number, c.original_code, c.new_code, c.author, c.commit_hash)
+                for c in fixer.suggest_code_changes()]
+    assert summary(streamed) == summary(plain)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    git = pytest.importorskip("git")
+    repo = git.Repo.init(tmp_path / "repo")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    app = tmp_path / "repo" / "app"
+    app.mkdir()
+    (app / "file.py").write_text("a\nb\nc\n")
+    repo.git.add("--", "app/file.py")
+    repo.git.commit("-m", "init")
+    monkeypatch.setenv("REPO_PATH", str(tmp_path / "repo"))
+    return repo
+
+
+def test_apply_code_changes_commits_on_a_new_branch(fixer, repo):
+    base = repo.head.commit
+    branch = fixer.apply_code_changes([change(2, "B")])
+    assert branch == "fix/ERR_TEST"
+    assert repo.active_branch.name == branch
+    assert repo.head.commit.parents == (base,)
+    assert repo.head.commit.tree["app/file.py"].data_stream.read() == b"a\nB\nc\n"
+
+
+def test_apply_code_changes_keeps_the_last_duplicate_change(fixer, repo):
+    fixer.apply_code_changes([change(2, "first"), change(2, "second")])
+    assert repo.head.commit.tree["app/file.py"].data_stream.read() == b"a\nsecond\nc\n"
+
+
+def test_apply_code_changes_without_changes_returns_none(fixer, repo):
+    head = repo.head.commit
+    assert fixer.apply_code_changes([]) is None
+    assert repo.head.commit == head
+    assert "fix/ERR_TEST" not in repo.heads
+
+
+def test_apply_code_changes_that_change_nothing_returns_none(fixer, repo):
+    head = repo.head.commit
+    assert fixer.apply_code_changes([change(2, "b"), change(10, "out of range")]) is None
+    assert repo.head.commit == head
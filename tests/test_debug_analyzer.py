@@ -0,0 +1,79 @@
+import json
+import os
+from collections import OrderedDict
+
+import pytest
+
+import debug_analyzer_v2
+from debug_analyzer_v2 import analyze_error, rendered_issue, wait_for_issue_file
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("NOTIFY_URL", raising=False)
+    monkeypatch.setattr(debug_analyzer_v2, "_analysis_cache", OrderedDict())
+
+
+def test_analyze_error_writes_the_issue_file():
+    issue_data = analyze_error("ERR_123", quiet=True)
+    wait_for_issue_file("ERR_123")
+    with open("issue_ERR_123.json", "rb") as f:
+        content = f.read()
+    assert content == rendered_issue("ERR_123")
+    assert json.loads(content) == issue_data
+    assert issue_data["error_details"]["type"] == "DatabaseError"
+    assert issue_data["git_commits"]
+
+
+def test_repeat_analysis_reuses_the_result():
+    first = analyze_error("ERR_123", quiet=True)
+    wait_for_issue_file("ERR_123")
+    assert analyze_error("ERR_123", quiet=True) == first
+
+
+def test_repeat_analysis_rewrites_a_modified_issue_file():
+    analyze_error("ERR_123", quiet=True)
+    wait_for_issue_file("ERR_123")
+    with open("issue_ERR_123.json", "wb") as f:
+        f.write(b"{}")
+    analyze_error("ERR_123", quiet=True)
+    wait_for_issue_file("ERR_123")
+    with open("issue_ERR_123.json", "rb") as f:
+        assert f.read() == rendered_issue("ERR_123")
+
+
+def test_repeat_analysis_rewrites_a_removed_issue_file():
+    analyze_error("ERR_123", quiet=True)
+    wait_for_issue_file("ERR_123")
+    os.remove("issue_ERR_123.json")
+    analyze_error("ERR_123", quiet=True)
+    wait_for_issue_file("ERR_123")
+    assert os.path.exists("issue_ERR_123.json")
+
+
+def test_failed_issue_file_write_is_raised():
+    os.mkdir("issue_ERR_123.json")
+    analyze_error("ERR_123", quiet=True)
+    with pytest.raises(IsADirectoryError):
+        wait_for_issue_file("ERR_123")
+
+
+def test_returned_data_is_a_copy():
+    for _ in range(2):
+        issue_data = analyze_error("ERR_456", quiet=True)
+        issue_data["code_analysis"].clear()
+        issue_data["git_commits"][0]["files_changed"].append("tampered.py")
+    fresh = analyze_error("ERR_999", quiet=True)
+    assert fresh["code_analysis"]
+    assert "tampered.py" not in fresh["git_commits"][0]["files_changed"]
+    assert json.loads(rendered_issue("ERR_456"))["code_analysis"]
+
+
+def test_cache_evicts_the_least_recently_used_entry(monkeypatch):
+    monkeypatch.setattr(debug_analyzer_v2, "_ANALYSIS_CACHE_SIZE", 2)
+    analyze_error("ERR_1", quiet=True)
+    analyze_error("ERR_2", quiet=True)
+    analyze_error("ERR_1", quiet=True)
+    analyze_error("ERR_3", quiet=True)
+    assert list(debug_analyzer_v2._analysis_cache) == ["ERR_1", "ERR_3"]